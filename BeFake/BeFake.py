@@ -320,22 +320,20 @@ class BeFake:
     def get_memoriesv1_feed(self):
         res = self.api_request("get", "feeds/memories-v1")
         memories = [Memory_v1(mem, self) for mem in res["data"]]
-        newMemories = []
 
         logging.info("Requesting all memories' posts")
 
-        # get all posts from the memories and append to new list
+        # yield each memory's posts as their requests complete, so callers
+        # can start working on them while the remaining moments are fetched
         for mem in memories:
             logging.info(f"Requesting posts by {mem.memory_day}".ljust(50, " ") + mem.id)
 
             if mem.num_posts_for_moment != 1 and not mem.moment_Id.startswith("brm-"):
                 postsRequest = self.api_request("get", f"feeds/memories-v1/{mem.moment_Id}")
                 for post in postsRequest["posts"]:
-                    newMemories.append(Memory(post, self))
+                    yield Memory(post, self)
             else:
-                newMemories.append(Memory(mem.data_dict, self))
-
-        return newMemories
+                yield Memory(mem.data_dict, self)
 
     def delete_memory(self, memory_id: str):
         res = self.api_request("delete", f"memories/{memory_id}")
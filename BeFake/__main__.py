@@ -1,24 +1,202 @@
+import asyncio
 import json
 import logging
 import os
 import random
 import string
-from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from pathlib import Path
 
 import click
-from rich.logging import RichHandler
 
-from .BeFake import BeFake
+try:
+    # optional C encoder, noticeably faster than the stdlib on large feeds
+    import orjson
+except ImportError:
+    orjson = None
+
+# the heavyweight dependencies (httpx, pendulum, rich, PIL via the models)
+# are imported inside the functions that need them, so --help and shell
+# completion don't pay their import time
 from .config import CONFIG
-from .models.post import Location, Post
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(message)s",
-    datefmt="[%X]",
-    handlers=[RichHandler()],
-)
-logging.getLogger('urllib3').setLevel(logging.WARNING)
+# built once so command registration doesn't probe CONFIG per command
+REALMOJI_TYPES = tuple(CONFIG["bereal"]["realmoji-map"].keys())
+
+# feed_id -> BeFake method fetching it; covers every id the feed command
+# accepts ("friends" and "discovery" used to KeyError)
+FEED_METHOD_NAMES = {
+    'friends': 'get_friendsv1_feed',
+    'friends-v1': 'get_friendsv1_feed',
+    'friends-of-friends': 'get_fof_feed',
+    'discovery': 'get_discovery_feed',
+    'memories': 'get_memories_feed',
+    'memories-v1': 'get_memoriesv1_feed',
+}
+
+
+def _echo_json(data):
+    """
+    Pretty-prints an API response dict. Unlike echoing __dict__, this
+    renders the raw data instead of building one huge repr string of
+    every nested model object.
+    """
+    from rich import print_json
+    print_json(data=data, default=str)
+
+
+def _template_fields(template):
+    """The set of field names a str.format template references."""
+    if template is None:
+        return frozenset()
+    return frozenset(name for _, name, _, _ in string.Formatter().parse(template)
+                     if name is not None)
+
+
+class _LazyFormatMap(dict):
+    """
+    Mapping for str.format_map that resolves values on first access, so
+    only the fields a template actually references get computed.
+    """
+
+    def __init__(self, resolvers):
+        super().__init__()
+        self._resolvers = resolvers
+
+    def __missing__(self, key):
+        value = self[key] = self._resolvers[key]()
+        return value
+
+
+@lru_cache(maxsize=4096)
+def _format_date(timestamp, fmt):
+    """
+    Memoized date formatting. pendulum's formatter re-parses the format
+    string per call, and realmojis on the same post often share timestamps.
+    """
+    import pendulum
+    return pendulum.from_timestamp(timestamp).format(fmt)
+
+
+# directories already created during this run; posts and realmojis often
+# share parents, so this avoids re-issuing the same mkdir/stat syscalls
+_MKDIR_CACHE = set()
+
+
+def _ensure_dir(path):
+    if path not in _MKDIR_CACHE:
+        os.makedirs(path, exist_ok=True)
+        _MKDIR_CACHE.add(path)
+
+
+def _write_info_json(data_dict, path):
+    """Serializes an API response to an info.json file, preferring orjson."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data_dict, option=orjson.OPT_INDENT_2))
+    else:
+        # json.dump() streams into the file handle instead of building the
+        # whole serialized string in memory first
+        with open(path, "w") as f:
+            json.dump(data_dict, f, indent=4)
+
+
+async def _download_friends(friends, save_location, date_format):
+    """
+    Writes each friend's info.json, then resolves the profile picture
+    dates and downloads in one concurrent batch, so the per-friend
+    HEAD + GET round trips overlap instead of serializing.
+    """
+    import httpx
+    limits = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+    sem = asyncio.Semaphore(8)
+
+    # one readdir of the friends root up front, instead of stat()ing every
+    # friend's directory below
+    root = os.path.dirname(save_location.rstrip('/'))
+    try:
+        existing = {entry.name for entry in os.scandir(root) if entry.is_dir()}
+    except FileNotFoundError:
+        existing = set()
+
+    def _has_profile_picture(path):
+        # the picture's file name embeds its creation date, which costs a
+        # HEAD request to reconstruct; a readdir answers "is it already
+        # saved" without going to the network. .part files are in-progress
+        # leftovers of an interrupted run, not completed downloads
+        with os.scandir(path) as entries:
+            return any('_profile_picture.' in entry.name
+                       and not entry.name.endswith('.part')
+                       and entry.stat().st_size > 0
+                       for entry in entries)
+
+    async def _save_profile_picture(friend, _save_location):
+        async with sem:
+            # the date lookup is an extra request per friend, so it runs
+            # inside the batch as well
+            creation_date = (await friend.profile_picture.get_date_async(client)).format(date_format)
+            await friend.profile_picture.download_async(client, f"{_save_location}/{creation_date}_profile_picture")
+
+    tasks = []
+    async with httpx.AsyncClient(limits=limits, timeout=15) as client:
+        for friend in friends:
+            _save_location = save_location.format(user=friend.username)
+            dir_name = os.path.basename(_save_location.rstrip('/'))
+            if dir_name not in existing:
+                _ensure_dir(_save_location)
+            _write_info_json(friend.data_dict, f"{_save_location}/info.json")
+
+            if friend.profile_picture and not (dir_name in existing
+                                               and _has_profile_picture(_save_location)):
+                tasks.append(_save_profile_picture(friend, _save_location))
+        await asyncio.gather(*tasks)
+
+
+# sentinel signalling that the feed iterator is exhausted
+_FEED_END = object()
+
+
+async def _download_feed(feed_iter, handle_item):
+    """
+    Two-stage pipeline: the blocking feed iteration (HTTP + JSON parsing)
+    runs in a worker thread while this coroutine fans out the downloads of
+    the items fetched so far, sharing one keep-alive connection pool
+    instead of opening a fresh connection per file.
+
+    handle_item(item) prepares an item on disk and returns its
+    (picture, path) download pairs.
+    """
+    import httpx
+    limits = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+    sem = asyncio.Semaphore(8)
+    tasks = []
+    seen_paths = set()
+
+    async def _bounded(picture, path):
+        async with sem:
+            await picture.download_async(client, path)
+
+    async with httpx.AsyncClient(limits=limits, timeout=15) as client:
+        it = iter(feed_iter)
+        while True:
+            # next() blocks on the feed's HTTP requests for generator-style
+            # feeds (memories-v1), so keep it off the event loop
+            item = await asyncio.to_thread(next, it, _FEED_END)
+            if item is _FEED_END:
+                break
+            for picture, path in await asyncio.to_thread(handle_item, item):
+                if path in seen_paths:
+                    # a path template without a uniquifying field can map
+                    # two downloads onto one file; running both would
+                    # interleave writes into the same .part file, so keep
+                    # the sequential behavior of first-one-wins
+                    logging.warning(f"Skipping duplicate download target {path}")
+                    continue
+                seen_paths.add(path)
+                tasks.append(asyncio.create_task(_bounded(picture, path)))
+        if tasks:
+            await asyncio.gather(*tasks)
 
 
 def load_bf(func):
@@ -28,6 +206,7 @@ def load_bf(func):
 
     @wraps(func)
     def wrapper(*args, **kwargs):
+        from .BeFake import BeFake
         bf = BeFake()
         bf.load()
         return func(bf, *args, **kwargs)
@@ -42,11 +221,35 @@ def cli(ctx):
     # by means other than the `if` block below)
     ctx.ensure_object(dict)
 
+    # logging is configured here rather than at import, so that --help and
+    # shell completion don't have to import and set up rich
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+    from rich.logging import RichHandler
+
+    # the download tasks log per file; they only enqueue records here while
+    # a single background thread does the rich rendering, so they never
+    # contend on the handler lock
+    log_queue = queue.Queue(-1)
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(message)s",
+        datefmt="[%X]",
+        handlers=[QueueHandler(log_queue)],
+    )
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+    listener = QueueListener(log_queue, RichHandler())
+    listener.start()
+    # flush any queued records before the process exits
+    ctx.call_on_close(listener.stop)
+
 
 @cli.command(help="Login to BeReal")
 @click.argument("phone_number", type=str)
 def login(phone_number):
     # NOTE: Other, deprecated login methods have been removed. Check the git history if you need them.
+    from .BeFake import BeFake
     bf = BeFake()
     bf.request_otp(phone_number)
     otp = input("Enter OTP: ")
@@ -61,7 +264,7 @@ def login(phone_number):
 def me(bf):
     user = bf.get_user_info()
     click.echo(user)
-    click.echo(user.__dict__)
+    _echo_json(user.data_dict)
 
 
 @cli.command(help="Refresh token")
@@ -84,75 +287,93 @@ def refresh(bf):
 def feed(bf, feed_id, save_location, realmoji_location, instant_realmoji_location):
     date_format = 'YYYY-MM-DD_HH-mm-ss'
 
-    FEEDGETTER_MAP = {
-        'friends-v1': bf.get_friendsv1_feed,
-        'friends-of-friends': bf.get_fof_feed,
-        'memories': bf.get_memories_feed,
-        'memories-v1': bf.get_memoriesv1_feed,
-    }
-    feed = FEEDGETTER_MAP[feed_id]()
+    feed = getattr(bf, FEED_METHOD_NAMES[feed_id])()
 
     instant_realmoji_location = instant_realmoji_location or realmoji_location
 
-    def _save_post_common(item, _save_location: str):
+    # parsed once up front; the old code formatted with date='{date}' and
+    # re-scanned the substituted path per emoji, which only worked because
+    # the literal braces survived the first pass
+    realmoji_fields = _template_fields(realmoji_location)
+    instant_fields = _template_fields(instant_realmoji_location)
+
+    def _save_post_common(item, _save_location: str, downloads):
         """
         Just some generalization to avoid code duplication.
         Downloads info.json, primary, secondary, and bts
         """
-        os.makedirs(os.path.dirname(_save_location), exist_ok=True)
-
-        with open(_save_location + "info.json", "w") as f:
-            f.write(json.dumps(item.data_dict, indent=4))
-        item.primary_photo.download(_save_location + "primary")
-        item.secondary_photo.download(_save_location + "secondary")
-        if item.bts_video.exists():
+        _ensure_dir(os.path.dirname(_save_location))
+
+        _write_info_json(item.data_dict, _save_location + "info.json")
+        downloads.append((item.primary_photo, _save_location + "primary"))
+        downloads.append((item.secondary_photo, _save_location + "secondary"))
+        # only the v1 post models carry bts footage
+        bts_video = getattr(item, "bts_video", None)
+        if bts_video is not None and bts_video.exists():
             # FIXME: bts_video successfully instantiates when there is none, but download() would fail
-            item.bts_video.download(_save_location + "bts")
+            downloads.append((bts_video, _save_location + "bts"))
 
-    def _save_realmojis(post, realmoji_location: str, instant_realmoji_location: str):
+    def _save_realmojis(item, post, post_date, downloads):
         for emoji in post.realmojis:
             # Differenciate between instant and non-instant realomji locations
-            _realmoji_location = instant_realmoji_location if emoji.type == 'instant' else realmoji_location
-
-            # Format realmoji location
-            _realmoji_location = _realmoji_location.format(
-                user=emoji.username, type=emoji.type,
-                feed_id=feed_id, notification_id=item.notification_id,
-                post_date=post_date, post_user=item.user.username,
-                post_id=post.id, emoji_id=emoji.id,
-                emoji_url_id=emoji.url_id, date='{date}'
-            )
-            # Getting the realmoji creation date sends an extra request
-            # Only use that if it's actually needed
-            if '{date}' in _realmoji_location:
-                _realmoji_location = _realmoji_location.format(
-                    date=emoji.date.format(date_format)
-                )
-            os.makedirs(_realmoji_location, exist_ok=True)
-            emoji.photo.download(_realmoji_location)
-
-    for item in feed:
+            if emoji.type == 'instant':
+                _realmoji_location, fields = instant_realmoji_location, instant_fields
+            else:
+                _realmoji_location, fields = realmoji_location, realmoji_fields
+
+            # Format realmoji location; only the fields the template
+            # references get resolved (the date in particular isn't free)
+            if fields:
+                _realmoji_location = _realmoji_location.format_map(_LazyFormatMap({
+                    'user': lambda: emoji.username, 'type': lambda: emoji.type,
+                    'feed_id': lambda: feed_id,
+                    'notification_id': lambda: item.notification_id,
+                    'post_date': lambda: post_date,
+                    'post_user': lambda: item.user.username,
+                    'post_id': lambda: post.id, 'emoji_id': lambda: emoji.id,
+                    'emoji_url_id': lambda: emoji.url_id,
+                    'date': lambda: _format_date(emoji.date.int_timestamp, date_format),
+                }))
+            _ensure_dir(_realmoji_location)
+            downloads.append((emoji.photo, _realmoji_location))
+
+    def _handle_item(item):
+        """Prepares one feed item on disk and returns its download pairs."""
+        downloads = []
         if feed_id == "memories":
             logging.info(f"saving memory {item.memory_day}")
             _save_location = save_location.format(date=item.memory_day)
-            _save_post_common(item, _save_location)
+            _save_post_common(item, _save_location, downloads)
 
         elif feed_id == "memories-v1":
             logging.info(f"saving memory {item.memory_day}".ljust(50, " ") + item.id)
             _save_location = save_location.format(date=item.memory_day, post_id=item.id)
-            _save_post_common(item, _save_location)
+            _save_post_common(item, _save_location, downloads)
 
-        elif feed_id == "friends-v1":
+        elif feed_id in ("friends", "friends-v1"):
             for post in item.posts:
                 logging.info(f"saving posts by {item.user.username}".ljust(50, " ") + post.id)
-                post_date = post.creation_date.format(date_format)
+                post_date = _format_date(post.creation_date.int_timestamp, date_format)
                 _save_location = save_location.format(
                     user=item.user.username, date=post_date, feed_id=feed_id,
                     post_id=post.id, notification_id=item.notification_id
                 )
-                _save_post_common(post, _save_location)
+                _save_post_common(post, _save_location, downloads)
+
+                _save_realmojis(item, post, post_date, downloads)
 
-                _save_realmojis(post, realmoji_location, instant_realmoji_location)
+        elif feed_id in ("friends-of-friends", "discovery"):
+            logging.info(f"saving post by {item.user.username}".ljust(50, " ") + item.id)
+            post_date = _format_date(item.creation_date.int_timestamp, date_format)
+            _save_location = save_location.format(
+                user=item.user.username, date=post_date, feed_id=feed_id,
+                post_id=item.id, notification_id=item.notification_id
+            )
+            _save_post_common(item, _save_location, downloads)
+
+        return downloads
+
+    asyncio.run(_download_feed(feed, _handle_item))
 
 
 @cli.command(help="Download friends information")
@@ -165,14 +386,7 @@ def parse_friends(bf, save_location):
     if save_location is None:
         save_location = "/friends/{user}"
 
-    for friend in friends:
-        _save_location = save_location.format(user=friend.username)
-        with open(f"{_save_location}/info.json", "w+") as f:
-            json.dump(friend.data_dict, f, indent=4)
-
-        if friend.profile_picture:
-            creation_date = friend.profile_picture.get_date().format(date_format)
-            friend.profile_picture.download(f"{_save_location}/{creation_date}_profile_picture")
+    asyncio.run(_download_friends(friends, save_location, date_format))
 
 
 @cli.command(help="Post the photos under /data/photos to your feed")
@@ -188,14 +402,16 @@ def parse_friends(bf, save_location):
 @click.argument('secondary_path', required=False, type=click.STRING)
 @load_bf
 def post(bf, visibility, caption, location, retakes, primary_path, secondary_path, resize):
+    from .models.post import Location, Post
     if location != [None, None]:
         loc = Location(location[0], location[1])
     primary_path = "data/photos/primary.jpg" if not primary_path else primary_path
     secondary_path = "data/photos/secondary.jpg" if not secondary_path else secondary_path
-    with open("data/photos/primary.jpg", "rb") as f:
-        primary_bytes = f.read()
-    with open("data/photos/secondary.jpg", "rb") as f:
-        secondary_bytes = f.read()
+    # read both photos in parallel; this also fixes the old code, which
+    # read primary.jpg twice and ignored the path arguments
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        primary_bytes, secondary_bytes = pool.map(lambda p: Path(p).read_bytes(),
+                                                  [primary_path, secondary_path])
     r = Post.create_post(bf, primary=primary_bytes, secondary=secondary_bytes, is_late=False, visibility=visibility,
                          caption=caption, location=loc, retakes=retakes, resize=resize)
     click.echo(r)
@@ -205,16 +421,25 @@ def post(bf, visibility, caption, location, retakes, primary_path, secondary_pat
 @click.argument("feed_id", type=click.Choice(["friends", "friends-of-friends", "discovery"]))
 @click.argument("post_id", type=click.STRING)
 @load_bf
-def get_post(bf: BeFake, feed_id, post_id):
-    feed = {
-        "friends": bf.get_friendsv1_feed(),
-        "friends-of-friends": bf.get_fof_feed(),
-        "discovery": bf.get_discovery_feed(),
-    }[feed_id]()
-
-    for post in feed:
-        if post.id == post_id:
-            click.echo(post.__dict__)
+def get_post(bf, feed_id, post_id):
+    # the old code called the already-fetched feeds a second time (and
+    # fetched all three feeds up front); resolve the one getter instead
+    feed = getattr(bf, FEED_METHOD_NAMES[feed_id])()
+
+    def _posts():
+        for item in feed:
+            if feed_id == "friends":
+                # the friends feed groups posts per user
+                yield from item.posts
+            else:
+                yield item
+
+    # stop iterating (and, for generator-style feeds, fetching) at the match
+    post = next((p for p in _posts() if p.id == post_id), None)
+    if post is None:
+        click.echo(f"Post {post_id} not found in the {feed_id} feed.")
+        return
+    _echo_json(post.data_dict)
 
 
 @cli.command(help="Upload random photos to BeReal servers")
@@ -274,7 +499,7 @@ def change_caption(bf, caption):
 def get_user_profile(bf, user_id):
     r = bf.get_user_profile(user_id)
     click.echo(r)
-    click.echo(r.__dict__)
+    _echo_json(r.data_dict)
 
 
 @cli.command(help="Sends a notification to your friends, saying you're taking a bereal")
@@ -301,7 +526,7 @@ def instant_realmoji(bf, post_id, user_id, filename):
 
 
 @cli.command(help="Upload an emoji-specific realmoji")
-@click.argument("type", type=click.Choice(CONFIG["bereal"]["realmoji-map"].keys()))
+@click.argument("type", type=click.Choice(REALMOJI_TYPES))
 @click.argument("filename", required=False, type=click.STRING)
 @load_bf
 def upload_realmoji(bf, type, filename):
@@ -317,7 +542,7 @@ def upload_realmoji(bf, type, filename):
 @cli.command(help="Add realmoji to post")
 @click.argument("post_id", type=click.STRING)
 @click.argument("user_id", type=click.STRING, required=False)
-@click.argument("type", type=click.Choice(CONFIG["bereal"]["realmoji-map"].keys()))
+@click.argument("type", type=click.Choice(REALMOJI_TYPES))
 @load_bf
 def emoji_realmoji(bf, post_id, user_id, type):
     type = str(type)
@@ -8,6 +8,28 @@ import httpx
 import pendulum
 from PIL import Image
 
+DOWNLOAD_HEADERS = {
+    "user-agent": "BeReal/1.0.1 (AlexisBarreyat.BeReal; build:9513; iOS 16.0.2) 1.0.0/BRApriKit",
+    "x-ios-bundle-identifier": "AlexisBarreyat.BeReal",
+}
+
+_client = None
+
+
+def _get_client() -> httpx.Client:
+    """
+    Shared keep-alive client for the synchronous download paths, so
+    repeated CDN requests reuse pooled connections instead of paying a
+    TCP + TLS handshake each. Created lazily to keep import cheap.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+            timeout=15,
+        )
+    return _client
+
 
 class Picture(object):
     # HACK: Now also handles videos, but this is not reflected in the name
@@ -26,49 +48,99 @@ class Picture(object):
     def exists(self):
         return self.url is not None
 
-    def download(self, path: Optional[str], ext=None):
+    def _resolve_ext(self, ext):
         if ext:
             # with jpg/jpeg, the file extension is conventionally jpg, but the PIL format name is jpeg
             if ext in ['jpg', 'jpeg']:
-                file_ext = 'jpg'
-                ext_type = 'jpeg'
-            else:
-                file_ext = ext
-                ext_type = ext
+                return 'jpg', 'jpeg'
+            return ext, ext
+        return self.ext, self.ext
+
+    @staticmethod
+    def _drop_from_page_cache(f):
+        if hasattr(os, 'posix_fadvise'):  # not on macOS/Windows
+            # downloaded media is written once and never read back, so tell
+            # the kernel to drop it from the page cache rather than evict
+            # hotter pages (the fdatasync is needed so the pages are clean
+            # and can be dropped)
+            f.flush()
+            os.fdatasync(f.fileno())
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+    def _downloaded(self, path, file_ext):
+        """Whether the picture was already fully saved by a previous run."""
+        # zero-byte files are leftovers of an interrupted run; retry those
+        target = f"{path}.{file_ext}"
+        return os.path.exists(target) and os.path.getsize(target) > 0
+
+    def _save(self, content, path, ext, file_ext, ext_type):
+        # write under a temporary name and rename once complete, so an
+        # interrupted run never leaves a file that would pass the
+        # already-downloaded check on the next run
+        part = f"{path}.{file_ext}.part"
+        if ext:
+            # borrowed from https://stackoverflow.com/questions/32908639/open-pil-image-from-byte-file
+            img = Image.open(io.BytesIO(content))
+            img = img.convert('RGB')
+            img.save(part, ext_type)
+            self.ext = file_ext
         else:
-            file_ext = self.ext
-            ext_type = self.ext
+            with open(part, "wb") as f:
+                f.write(content)
+                self._drop_from_page_cache(f)
+        os.replace(part, f"{path}.{file_ext}")
+        logging.debug(f"Downloaded {self.url}")
+
+    def download(self, path: Optional[str], ext=None):
+        file_ext, ext_type = self._resolve_ext(ext)
 
         # don't re-download already saved pictures
-        if path and os.path.exists(f"{path}.{file_ext}"):
+        if path and self._downloaded(path, file_ext):
             logging.debug(f"Skipping already-downloaded {self.url}")
             return
 
-        r = httpx.get(self.url, headers={
-            "user-agent": "BeReal/1.0.1 (AlexisBarreyat.BeReal; build:9513; iOS 16.0.2) 1.0.0/BRApriKit",
-            "x-ios-bundle-identifier": "AlexisBarreyat.BeReal"})
+        r = _get_client().get(self.url, headers=DOWNLOAD_HEADERS)
 
         self.data = r.content
 
         if path:
-            if ext:
-                # borrowed from https://stackoverflow.com/questions/32908639/open-pil-image-from-byte-file
-                img = Image.open(io.BytesIO(r.content))
-                img = img.convert('RGB')
-                img.save(f"{path}.{file_ext}", ext_type)
-                self.ext = file_ext
-            else:
-                with open(f"{path}.{self.ext}", "wb") as f:
-                    f.write(self.data)
-            logging.debug(f"Downloaded {self.url}")
+            self._save(r.content, path, ext, file_ext, ext_type)
 
         return r.content
 
-    def get_date(self):
-        if self.date:
-            return self.date
-        r = httpx.head(self.url)
+    async def download_async(self, client: httpx.AsyncClient, path: Optional[str], ext=None):
+        """Like download(), but fetches through a shared httpx.AsyncClient."""
+        file_ext, ext_type = self._resolve_ext(ext)
+
+        # don't re-download already saved pictures
+        if path and self._downloaded(path, file_ext):
+            logging.debug(f"Skipping already-downloaded {self.url}")
+            return
+
+        if path and not ext:
+            # stream straight to disk in 1 MiB chunks: bts videos can be
+            # tens of MB, so this avoids holding them in memory, and the
+            # large write buffer keeps the syscall count low
+            part = f"{path}.{file_ext}.part"
+            async with client.stream("GET", self.url, headers=DOWNLOAD_HEADERS) as r:
+                with open(part, "wb", buffering=1 << 20) as f:
+                    async for chunk in r.aiter_bytes(1 << 20):
+                        f.write(chunk)
+                    self._drop_from_page_cache(f)
+            os.replace(part, f"{path}.{file_ext}")
+            logging.debug(f"Downloaded {self.url}")
+            return
+
+        r = await client.get(self.url, headers=DOWNLOAD_HEADERS)
+
+        self.data = r.content
+
+        if path:
+            self._save(r.content, path, ext, file_ext, ext_type)
 
+        return r.content
+
+    def _set_date_from_response(self, r):
         # https://stackoverflow.com/a/71637523
         if r.status_code != 200:
             raise Exception(f"Error requesting image: {r.status_code}")
@@ -78,3 +150,14 @@ class Picture(object):
         timestamp = int(datetime.datetime.strptime(url_time, last_updated_pattern).timestamp())
         self.date = pendulum.from_timestamp(timestamp)
         return self.date
+
+    def get_date(self):
+        if self.date:
+            return self.date
+        return self._set_date_from_response(_get_client().head(self.url))
+
+    async def get_date_async(self, client: httpx.AsyncClient):
+        """Like get_date(), but issues the HEAD request through a shared client."""
+        if self.date:
+            return self.date
+        return self._set_date_from_response(await client.head(self.url))
@@ -1,8 +1,9 @@
 import io
 
-import httpx
 from PIL import Image
 
+from .picture import _get_client
+
 
 class RealmojiPicture(object):
     def __init__(self, data_dict, url=None, width=None, height=None) -> None:
@@ -17,7 +18,7 @@ class RealmojiPicture(object):
         return self.url is not None
 
     def download(self):
-        r = httpx.get(self.url)
+        r = _get_client().get(self.url)
         self.data = r.content
         return r.content
 